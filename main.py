@@ -3,45 +3,183 @@ An application that downloads the current NASA astronomic picture of the day (AP
 and adds its explanation as text overlay for use as a wallpaper.
 """
 
+from __future__ import annotations
+
+from functools import lru_cache
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, Tuple
-from urllib.parse import urlparse
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
+import errno
+import io
+import fcntl
+import hashlib
+import json
+import math
 import os
+import re
+import shutil
 import subprocess
 import logging
+import logging.handlers
+import queue
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 import requests
-from dotenv import load_dotenv
-from PIL import Image, ImageDraw, ImageFont
-import textwrap
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+if TYPE_CHECKING:
+    from PIL import Image, ImageFont
 
 # --- Constants ---
 TEMP_SAVE_DIR_WSL = Path("/tmp/apod-nasa")
 FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
-LOG_FILE = os.getenv("LOG_FILE_PATH")
-if not LOG_FILE:
-    LOG_FILE = str(Path(__file__).parent / "logs.txt")
-# --- Logging Setup ---
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s: %(message)s"
-)
-logging.info("Script started.")
+MIN_FONT_SIZE = 10
+LINE_SPACING = 4  # extra pixels between lines, Pillow's multiline_text default
+TEXT_MARKER_KEY = "Comment"
+ENV_FILE = Path(__file__).parent / ".env"
+DEFAULT_LOG_FILE = Path(__file__).parent / "logs.txt"
 
+WINDOWS_DRIVE_PATH = re.compile(r"([A-Za-z]):[\\/](.*)")
 BASE_URL: str = "https://api.nasa.gov/planetary/apod?"
+REQUEST_TIMEOUT = 10  # seconds to wait for NASA to connect or send data
+APOD_TIMEZONE = "America/New_York"  # APOD switches pictures at midnight US Eastern time
+
+# --- HTTP Session ---
+# A shared session keeps connections to the NASA hosts alive between the API call
+# and the image download, and retries transient server errors with backoff.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    ),
+))
 
-def load_config() -> Tuple[str, Path]:
+def get_log_file() -> Path:
+    """
+    Return the log file path from LOG_FILE_PATH, defaulting to logs.txt next to this script.
+
+    Read on demand rather than at import time, so a LOG_FILE_PATH set in the
+    .env file is honored.
+
+    Returns:
+        Path: Path to the log file
+    """
+    return Path(os.getenv("LOG_FILE_PATH") or DEFAULT_LOG_FILE)
+
+def get_state_file() -> Path:
+    """
+    Return the path of the state file, which is kept next to the log file.
+
+    Returns:
+        Path: Path to the state file
+    """
+    return get_log_file().parent / "apod-state.json"
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Configure logging to the log file.
+
+    Records are put on a queue and written to the file by a background thread, so
+    log calls do not block on disk writes (slow when the log file is on /mnt/c).
+    Called from main() rather than at import time, so importing this module
+    (e.g. from the tests) does not open the log file.
+
+    Returns:
+        logging.handlers.QueueListener: The started listener; stop it to flush the log.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    file_handler = logging.FileHandler(get_log_file())
+    file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s: %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(logging.INFO)
+    listener.start()
+    logging.info("Script started.")
+    return listener
+
+def stop_logging(listener: logging.handlers.QueueListener) -> None:
+    """
+    Flush the queued log records, close the log file and detach the queue handler.
+
+    This undoes setup_logging, so main() can be called repeatedly in one process
+    without stacking handlers on the root logger.
+
+    Args:
+        listener (logging.handlers.QueueListener): Listener returned by setup_logging
+    """
+    listener.stop()
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        if isinstance(handler, logging.handlers.QueueHandler) and handler.queue is listener.queue:
+            root_logger.removeHandler(handler)
+    for handler in listener.handlers:
+        handler.close()
+
+def load_env_file(env_file: Path = ENV_FILE) -> None:
+    """
+    Load KEY=value pairs from a .env file into the environment.
+
+    Variables that are already set are not overridden. Plain KEY=value lines are
+    parsed directly; files using quoting, variable expansion, inline comments or
+    export prefixes are handed to python-dotenv instead.
+
+    Args:
+        env_file (Path): Path to the .env file
+    """
+    if not env_file.exists():
+        return
+    variables = {}
+    for line in env_file.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        key, separator, value = line.partition("=")
+        if (
+            not separator
+            or key.startswith("export ")
+            or value[:1] in ("'", '"')
+            or "${" in value
+            or " #" in value
+        ):
+            from dotenv import load_dotenv
+
+            load_dotenv(env_file)
+            return
+        variables[key.strip()] = value.strip()
+    for key, value in variables.items():
+        os.environ.setdefault(key, value)
+
+def load_config(load_env: bool = True) -> Tuple[str, Optional[Path]]:
     """
     Load environment variables and return API key and Windows save directory.
+
+    WINDOWS_SAVE_DIR is only required when WSL_NATIVE_SAVE_DIR is not set, as the
+    image is not copied to Windows otherwise.
+
+    Args:
+        load_env (bool): Whether to load the .env file first; main() has already loaded it
     
     Returns:
-        Tuple[str, Path]: The NASA APOD API key and Windows save directory path
+        Tuple[str, Optional[Path]]: The NASA APOD API key and Windows save directory path,
+        None if it is not set and not needed
         
     Raises:
         ValueError: If required environment variables are not set.
     """
-    load_dotenv()
+    if load_env:
+        load_env_file()
     api_key: Optional[str] = os.getenv('NASA_APOD_API_KEY')
     windows_save_dir: Optional[str] = os.getenv('WINDOWS_SAVE_DIR')
 
@@ -49,70 +187,321 @@ def load_config() -> Tuple[str, Path]:
         logging.error("NASA_APOD_API_KEY is not set. Please check your .env file.")
         raise ValueError("NASA_APOD_API_KEY is not set. Please check your .env file.")
     if not windows_save_dir:
+        if os.getenv('WSL_NATIVE_SAVE_DIR'):
+            return api_key, None
         logging.error("WINDOWS_SAVE_DIR is not set. Please check your .env file.")
         raise ValueError("WINDOWS_SAVE_DIR is not set. Please check your .env file.")
 
     return api_key, Path(windows_save_dir)
 
-def get_api_response(api_key: str) -> requests.Response:
+def load_state() -> Dict[str, str]:
+    """
+    Load the cache validators and output path saved by the last successful run.
+
+    Returns:
+        Dict[str, str]: The saved state, empty if there is none or it is unreadable
+    """
+    try:
+        return json.loads(get_state_file().read_text())
+    except (OSError, ValueError):
+        return {}
+
+def save_state(state: Dict[str, str]) -> None:
+    """
+    Save the cache validators and output path of a successful run.
+
+    Args:
+        state (Dict[str, str]): State to save
+    """
+    try:
+        get_state_file().write_text(json.dumps(state))
+    except OSError as e:
+        logging.warning(f"Could not save state to {get_state_file()}: {e}")
+
+def get_save_destination(windows_save_dir: Optional[Path]) -> str:
+    """
+    Return the directory this run saves the image to, as configured.
+
+    Args:
+        windows_save_dir (Optional[Path]): Windows save directory from load_config
+
+    Returns:
+        str: WSL_NATIVE_SAVE_DIR if it is set, otherwise WINDOWS_SAVE_DIR
+    """
+    return os.getenv("WSL_NATIVE_SAVE_DIR") or str(windows_save_dir)
+
+def conditional_headers(state: Dict[str, str], destination: str) -> Dict[str, str]:
+    """
+    Build conditional request headers from the state of the last run.
+
+    Headers are only sent while the last output still exists in the configured
+    destination, so a deleted or relocated wallpaper is downloaded again.
+
+    Args:
+        state (Dict[str, str]): State saved by the last successful run
+        destination (str): Save directory of this run, from get_save_destination
+
+    Returns:
+        Dict[str, str]: If-None-Match / If-Modified-Since headers, if available
+    """
+    if saved_output_path(state, destination) is None:
+        return {}
+    headers = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+    return headers
+
+def saved_output_path(state: Dict[str, str], destination: str) -> Optional[Path]:
+    """
+    Return the path of the image saved by the last run, if it still exists.
+
+    Output saved to another destination than the one configured now is not
+    returned, so changing the save directory saves the image there.
+
+    Args:
+        state (Dict[str, str]): State saved by the last successful run
+        destination (str): Save directory of this run, from get_save_destination
+
+    Returns:
+        Optional[Path]: Path of the last output, or None if there is none
+    """
+    output_path = state.get("output_path")
+    if state.get("destination") != destination or not output_path or not Path(output_path).exists():
+        return None
+    return Path(output_path)
+
+def is_saved_image(saved_output: Optional[Path], filename: str, image_explanation_text: Optional[str]) -> bool:
+    """
+    Check whether the last output already is this APOD image with this explanation.
+
+    Only the image header is read, to compare the marker stored by
+    add_image_explanation_text, so a corrected explanation is drawn again.
+
+    Args:
+        saved_output (Optional[Path]): Path of the last output, if any
+        filename (str): Filename of the current APOD image
+        image_explanation_text (Optional[str]): Current explanation text, if any
+
+    Returns:
+        bool: True if the saved image can be kept as is
+    """
+    if saved_output is None or saved_output.name != filename:
+        return False
+    if not image_explanation_text or not image_explanation_text.strip():
+        # Nothing is drawn for an empty explanation, so there is no marker to compare
+        return True
+    from PIL import Image
+
+    try:
+        with Image.open(saved_output) as image:
+            return read_text_marker(image) == text_marker(image_explanation_text)
+    except OSError:
+        return False
+
+def get_apod_date() -> str:
+    """
+    Return today's date in the APOD time zone.
+
+    Without a time zone database, Eastern Standard Time is used all year. In summer
+    that is an hour off, which only makes the cache miss for that hour, as responses
+    are only cached under the date they are for.
+
+    Returns:
+        str: The date in YYYY-MM-DD format
+    """
+    try:
+        apod_timezone = ZoneInfo(APOD_TIMEZONE)
+    except ZoneInfoNotFoundError:
+        apod_timezone = timezone(timedelta(hours=-5))
+    return datetime.now(apod_timezone).date().isoformat()
+
+def get_api_cache_file(apod_date: str) -> Path:
+    """
+    Return the path of the cached API response for an APOD date.
+
+    Args:
+        apod_date (str): APOD date in YYYY-MM-DD format
+
+    Returns:
+        Path: Path to the cache file in the temporary directory
+    """
+    return TEMP_SAVE_DIR_WSL / f"apod-{apod_date}.json"
+
+def load_cached_api_response(cache_file: Path) -> Optional[requests.Response]:
+    """
+    Rebuild an API response from a cache file written by save_cached_api_response.
+
+    Args:
+        cache_file (Path): Path to the cache file
+
+    Returns:
+        Optional[requests.Response]: The cached response, or None if there is no usable cache
+    """
+    try:
+        cached = json.loads(cache_file.read_bytes())
+    except (OSError, ValueError):
+        return None
+    headers = cached.get("headers") if isinstance(cached, dict) else None
+    content = cached.get("content") if isinstance(cached, dict) else None
+    if not isinstance(headers, dict) or not isinstance(content, str):
+        return None
+    response = requests.Response()
+    response.status_code = 200
+    response.headers.update(headers)
+    response.encoding = "utf-8"
+    response._content = content.encode()
+    return response
+
+def save_cached_api_response(response: requests.Response, apod_date: Optional[str]) -> None:
+    """
+    Cache the body and cache validators of an API response for the rest of its APOD day.
+
+    A response still showing the previous day's APOD is not cached, so the new one
+    is picked up once it is out. Cache files of earlier days are removed.
+
+    Args:
+        response (requests.Response): Successful response from the NASA APOD API
+        apod_date (Optional[str]): The "date" field of the response
+    """
+    if apod_date != get_apod_date():
+        return
+    cache_file = get_api_cache_file(apod_date)
+    headers = {name: response.headers[name] for name in ("ETag", "Last-Modified") if name in response.headers}
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        for old_cache_file in cache_file.parent.glob("apod-*.json"):
+            old_cache_file.unlink()
+        cache_file.write_text(json.dumps({"headers": headers, "content": response.text}))
+    except OSError as e:
+        logging.warning(f"Could not cache the APOD response: {e}")
+
+def get_api_response(api_key: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
     """
     Request APOD data from NASA API.
 
     Args:
         api_key (str): NASA API key for authentication.
+        headers (Optional[Dict[str, str]]): Additional request headers, e.g. for a conditional request.
 
     Returns:
-        requests.Response: Response from the NASA APOD API.
+        requests.Response: Response from the NASA APOD API. A conditional request
+        may return 304 Not Modified.
 
     Raises:
         requests.RequestException: If the API request fails.
     """
     url: str = f"{BASE_URL}api_key={api_key}"
     try:
-        response = requests.get(url)
+        response = SESSION.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response
     except requests.RequestException as e:
         logging.error(f"API request failed: {e}")
         raise
 
-def process_data(response: requests.Response) -> Tuple[str, Optional[requests.Response], Optional[str], Optional[str]]:
+def download_image(hd_image_url: str) -> Optional[requests.Response]:
+    """
+    Download the HD image referenced by the APOD entry.
+
+    Args:
+        hd_image_url (str): URL of the HD image.
+
+    Returns:
+        Optional[requests.Response]: Streaming response containing the image data,
+        or None if the download failed.
+    """
+    try:
+        image_response = SESSION.get(hd_image_url, stream=True, timeout=REQUEST_TIMEOUT)
+        image_response.raise_for_status()
+        return image_response
+    except requests.RequestException as e:
+        logging.error(f"Image download failed: {e}")
+        return None
+
+def process_data(
+    response: requests.Response,
+    executor: Optional[Executor] = None,
+    saved_output: Optional[Path] = None,
+    cache_response: bool = False,
+) -> Tuple[str, Union[Optional[requests.Response], Future], Optional[str], Optional[str]]:
     """
     Extract image URL and explanation text from API response.
 
+    When an executor is given, the image download is submitted to it and a Future
+    is returned in place of the response, so the caller can prepare the remaining
+    steps while the image is still downloading. No download is started when
+    saved_output already is this image with this explanation. With cache_response,
+    the response is cached on disk for the rest of its APOD day, reusing this parse.
+
     Args:
         response (requests.Response): Response from NASA APOD API.
+        executor (Optional[Executor]): Executor to run the image download on, if any.
+        saved_output (Optional[Path]): Path of the image saved by the last run, if any.
+        cache_response (bool): Whether to cache the response, i.e. it came from the network.
 
     Returns:
         Tuple containing:
             - str: Filename extracted from the URL
-            - Optional[requests.Response]: Response from image download request
+            - Union[Optional[requests.Response], Future]: Response from image download request,
+              or a Future resolving to it when an executor is given
             - Optional[str]: Explanation text for the image
             - Optional[str]: Media type of the APOD (e.g., "image", "video")
     """
-    data = response.json()
+    # orjson parses the payload straight from bytes when installed
+    data = orjson.loads(response.content) if orjson is not None else response.json()
+    if cache_response:
+        save_cached_api_response(response, data.get("date"))
     media_type: Optional[str] = data.get("media_type")
     hd_image_url: Optional[str] = data.get("hdurl")
     image_explanation_text: Optional[str] = data.get("explanation")
 
     filename: str = ""
-    image_response: Optional[requests.Response] = None
+    image_response: Union[Optional[requests.Response], Future] = None
 
     if media_type != "image":
         logging.info(f"Media type is '{media_type}'. No image to process.")
         return "", None, image_explanation_text, media_type
 
     if hd_image_url:
-        filename = urlparse(hd_image_url).path.split("/")[-1]
-        try:
-            image_response = requests.get(hd_image_url)
-            image_response.raise_for_status()
-        except requests.RequestException as e:
-            logging.error(f"Image download failed: {e}")
-            image_response = None
+        filename = hd_image_url.rsplit("/", 1)[-1].split("?", 1)[0].split("#", 1)[0]
+        if is_saved_image(saved_output, filename, image_explanation_text):
+            logging.info(f"Image {filename} is already saved. Skipping download.")
+        elif executor is not None:
+            image_response = executor.submit(download_image, hd_image_url)
+        else:
+            image_response = download_image(hd_image_url)
 
     return filename, image_response, image_explanation_text, media_type
 
+def write_image_response(image_response: requests.Response, image_path: Path) -> None:
+    """
+    Stream the body of an image download to a file.
+
+    Args:
+        image_response (requests.Response): Streaming response containing the image data
+        image_path (Path): Path to write the image to
+
+    Raises:
+        IOError: If there's an error writing the file
+    """
+    image_path.parent.mkdir(parents=True, exist_ok=True)
+    # Copy the streamed body straight to disk instead of buffering it in memory
+    image_response.raw.decode_content = True
+    content_length = image_response.headers.get("Content-Length")
+    with image_response, open(image_path, "wb") as image_file:
+        if content_length and not image_response.headers.get("Content-Encoding"):
+            # Reserve the space up front so a full disk fails before the download
+            try:
+                os.posix_fallocate(image_file.fileno(), 0, int(content_length))
+            except ValueError:
+                pass
+            except OSError as e:
+                if e.errno not in (errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+        shutil.copyfileobj(image_response.raw, image_file, length=1 << 16)
+
 def temp_save_to_wsl(filename: str, image_response: Optional[requests.Response]) -> Path:
     """
     Parse fetched content into an image file and save it.
@@ -125,28 +514,302 @@ def temp_save_to_wsl(filename: str, image_response: Optional[requests.Response])
         Path: Path to the saved temporary file
         
     Raises:
+        ValueError: If no image response is available
         IOError: If there's an error writing the file
     """
     if not image_response:
         logging.error("No image response provided")
         raise ValueError("No image response provided")
 
-    TEMP_SAVE_DIR_WSL.mkdir(parents=True, exist_ok=True)
     temp_save_path_wsl = TEMP_SAVE_DIR_WSL / filename
-
-    with open(temp_save_path_wsl, "wb") as image_file:
-        image_file.write(image_response.content)
+    write_image_response(image_response, temp_save_path_wsl)
     logging.info(f"Image downloaded temporarily to WSL: {temp_save_path_wsl}")
 
     return temp_save_path_wsl
 
-def add_image_explanation_text(temp_save_path_wsl: Path, image_explanation_text: Optional[str]) -> Path:
+@lru_cache(maxsize=4)
+def read_font_file(font_path: str) -> bytes:
+    """
+    Read a font file once, so loading further sizes of it does not touch the disk.
+
+    Args:
+        font_path (str): Path to the font file
+
+    Returns:
+        bytes: Contents of the font file
+    """
+    return Path(font_path).read_bytes()
+
+@lru_cache(maxsize=16)
+def get_font(font_path: str, font_size: int) -> ImageFont.FreeTypeFont:
+    """
+    Load a TrueType font, reusing the already parsed face for repeated sizes.
+
+    Args:
+        font_path (str): Path to the font file
+        font_size (int): Font size in pixels
+
+    Returns:
+        ImageFont.FreeTypeFont: The loaded font
+    """
+    from PIL import ImageFont
+
+    return ImageFont.truetype(io.BytesIO(read_font_file(font_path)), font_size)
+
+def get_target_size() -> Optional[Tuple[int, int]]:
+    """
+    Read the optional display resolution to downscale images to.
+
+    Returns:
+        Optional[Tuple[int, int]]: TARGET_WIDTH and TARGET_HEIGHT, or None if not both are set
+    """
+    target_width = os.getenv("TARGET_WIDTH")
+    target_height = os.getenv("TARGET_HEIGHT")
+    if not target_width or not target_height:
+        return None
+    try:
+        target_size = int(target_width), int(target_height)
+    except ValueError:
+        target_size = None
+    if target_size is None or min(target_size) <= 0:
+        logging.warning(f"Ignoring invalid target size {target_width}x{target_height}")
+        return None
+    return target_size
+
+def preload_font() -> None:
+    """
+    Import Pillow and read the font file, so FreeType is initialized and the font
+    is in memory before the first overlay is rendered.
+
+    Meant to run on a background thread while the image is downloading.
+    """
+    from PIL import ImageFont  # noqa: F401
+
+    read_font_file(FONT_PATH)
+
+@lru_cache(maxsize=4096)
+def char_width(font: ImageFont.FreeTypeFont, char: str) -> float:
+    """
+    Width of a single character, cached per font.
+
+    Explanations use the same few dozen characters thousands of times, so this
+    replaces most FreeType measurements with a cache lookup.
+
+    Args:
+        font (ImageFont.FreeTypeFont): Font the character will be drawn with
+        char (str): Character to measure
+
+    Returns:
+        float: Width of the character in pixels
+    """
+    return font.getlength(char)
+
+def wrap_to_pixels(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> str:
+    """
+    Greedily wrap text so that each line fits into max_width pixels.
+
+    Word widths are summed from cached character widths, which ignores kerning;
+    for DejaVu Sans this overestimates by well under a pixel, so lines never overflow.
+    A single word wider than max_width is put on its own line.
+
+    Args:
+        text (str): Text to wrap
+        font (ImageFont.FreeTypeFont): Font the text will be drawn with
+        max_width (int): Maximum line width in pixels
+
+    Returns:
+        str: The wrapped text, lines separated by newlines
+    """
+    space_width = char_width(font, " ")
+    word_widths: Dict[str, float] = {}
+    lines = []
+    line_words = []
+    line_width = 0.0
+    for word in text.split():
+        word_width = word_widths.get(word)
+        if word_width is None:
+            word_width = word_widths[word] = sum(char_width(font, char) for char in word)
+        if line_words and line_width + space_width + word_width > max_width:
+            lines.append(" ".join(line_words))
+            line_words, line_width = [word], word_width
+        else:
+            line_width += word_width + (space_width if line_words else 0)
+            line_words.append(word)
+    if line_words:
+        lines.append(" ".join(line_words))
+    return "\n".join(lines)
+
+def text_block_height(wrapped_text: str, font: ImageFont.FreeTypeFont) -> int:
+    """
+    Height of a wrapped text block, derived from the line count and font metrics
+    instead of laying out the whole paragraph.
+
+    multiline_text advances each line by the height of "A" plus LINE_SPACING,
+    and the last line takes the full ascent and descent of the font.
+
+    Args:
+        wrapped_text (str): Text with lines separated by newlines
+        font (ImageFont.FreeTypeFont): Font the text will be drawn with
+
+    Returns:
+        int: Height of the text block in pixels
+    """
+    ascent, descent = font.getmetrics()
+    line_step = font.getbbox("A")[3] + LINE_SPACING
+    return wrapped_text.count("\n") * line_step + ascent + descent
+
+def text_block_width(wrapped_text: str, font: ImageFont.FreeTypeFont) -> int:
+    """
+    Width of the widest line of a wrapped text block, summed from cached character widths.
+
+    Args:
+        wrapped_text (str): Text with lines separated by newlines
+        font (ImageFont.FreeTypeFont): Font the text will be drawn with
+
+    Returns:
+        int: Width of the text block in pixels, rounded up
+    """
+    return math.ceil(max(sum(char_width(font, char) for char in line) for line in wrapped_text.split("\n")))
+
+def fit_text(
+    text: str, max_width: int, max_height: int, font_size: int
+) -> Tuple[ImageFont.FreeTypeFont, str, int]:
+    """
+    Wrap text at font_size, shrinking the font if the text would be taller than max_height.
+
+    The block height grows with the font size, so the largest even size down to
+    MIN_FONT_SIZE that fits is found by binary search. If even MIN_FONT_SIZE does
+    not fit, it is used anyway.
+
+    Args:
+        text (str): Text to wrap
+        max_width (int): Maximum line width in pixels
+        max_height (int): Maximum height of the text block in pixels
+        font_size (int): Preferred font size in pixels
+
+    Returns:
+        Tuple containing:
+            - ImageFont.FreeTypeFont: The font to draw with
+            - str: The wrapped text
+            - int: Height of the text block in pixels
+    """
+    def layout(size: int) -> Tuple[ImageFont.FreeTypeFont, str, int]:
+        font = get_font(FONT_PATH, size)
+        wrapped_text = wrap_to_pixels(text, font, max_width)
+        return font, wrapped_text, text_block_height(wrapped_text, font)
+
+    preferred = layout(font_size)
+    if preferred[2] <= max_height or font_size <= MIN_FONT_SIZE:
+        return preferred
+
+    best = None
+    low, high = MIN_FONT_SIZE // 2, font_size // 2 - 1
+    while low <= high:
+        middle = (low + high) // 2
+        candidate = layout(middle * 2)
+        if candidate[2] <= max_height:
+            best = candidate
+            low = middle + 1
+        else:
+            high = middle - 1
+    return best or layout(MIN_FONT_SIZE)
+
+def render_text_mask(
+    wrapped_text: str, font: ImageFont.FreeTypeFont, size: Tuple[int, int], left_margin: int = 0
+) -> Image.Image:
+    """
+    Rasterize wrapped text into a grayscale mask, reusing a mask rendered by an earlier run.
+
+    The mask is cached in the overlays folder of TEMP_SAVE_DIR_WSL, keyed by the
+    text, font, line spacing, margin and mask size, so re-rendering the same APOD skips the
+    glyph rasterization. Only the latest mask is kept, as a run renders one.
+
+    Args:
+        wrapped_text (str): Text with lines separated by newlines
+        font (ImageFont.FreeTypeFont): Font to draw the text with
+        size (Tuple[int, int]): Width and height of the mask
+        left_margin (int): Pixels left of the text, for glyphs that extend past the pen position
+
+    Returns:
+        Image.Image: "L" mode mask with the text drawn in white
+    """
+    from PIL import Image, ImageDraw
+
+    cache_dir = TEMP_SAVE_DIR_WSL / "overlays"
+    key = hashlib.sha1(
+        f"{FONT_PATH}|{font.size}|{LINE_SPACING}|{left_margin}|{size}|{wrapped_text}".encode()
+    ).hexdigest()
+    cache_path = cache_dir / f"{key}.png"
+    try:
+        text_mask = Image.open(cache_path)
+        text_mask.load()
+        if text_mask.mode == "L" and text_mask.size == size:
+            return text_mask
+    except OSError:
+        pass
+
+    text_mask = Image.new("L", size, 0)
+    ImageDraw.Draw(text_mask).multiline_text(
+        (left_margin, 0), wrapped_text, fill=255, font=font, spacing=LINE_SPACING
+    )
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for old_mask in cache_dir.glob("*.png"):
+            old_mask.unlink()
+        text_mask.save(cache_path, "PNG", compress_level=1)
+    except OSError as e:
+        logging.warning(f"Could not cache text overlay: {e}")
+    return text_mask
+
+def read_text_marker(image: Image.Image) -> Optional[str]:
+    """
+    Read the explanation marker stored in an image by add_image_explanation_text.
+
+    JPEGs keep it in the COM segment and PNGs in a text chunk.
+
+    Args:
+        image (Image.Image): Opened image
+
+    Returns:
+        Optional[str]: The stored marker, or None if the image has none
+    """
+    marker = image.info.get("comment") or image.info.get(TEXT_MARKER_KEY)
+    if isinstance(marker, bytes):
+        marker = marker.decode("utf-8", "replace")
+    return marker
+
+def text_marker(image_explanation_text: str) -> str:
+    """
+    Build the marker that add_image_explanation_text stores for an explanation.
+
+    Args:
+        image_explanation_text (str): Explanation text drawn on the image
+
+    Returns:
+        str: Marker containing a hash of the text
+    """
+    return f"apod-nasa:{hashlib.sha1(image_explanation_text.encode()).hexdigest()}"
+
+def add_image_explanation_text(
+    temp_save_path_wsl: Path,
+    image_explanation_text: Optional[str],
+    image_response: Optional[requests.Response] = None,
+) -> Path:
     """
     Open an image, add wrapped explanation text to the bottom left, and save it.
+
+    If an image response is given, the image is decoded straight from the download
+    instead of from temp_save_path_wsl, so only the annotated image is written to disk.
+    Images larger than TARGET_WIDTH x TARGET_HEIGHT are downscaled first. A hash of the
+    text is stored in the saved JPEG or PNG, so reprocessing an image that already
+    carries the same text returns without decoding or drawing it again.
     
     Args:
         temp_save_path_wsl (Path): Path to the image file
         image_explanation_text (Optional[str]): Text to add to the image, if any
+        image_response (Optional[requests.Response]): Response containing the image data,
+            to read the image from instead of the file. Without explanation text, its body
+            is written to temp_save_path_wsl as is.
         
     Returns:
         Path: Path to the modified image
@@ -155,27 +818,91 @@ def add_image_explanation_text(temp_save_path_wsl: Path, image_explanation_text:
         FileNotFoundError: If the image file is not found
         IOError: If there's an error processing the image
     """
-    try:
-        image = Image.open(temp_save_path_wsl)
+    # Pillow is only needed on image days, so it is imported here instead of at startup
+    from PIL import Image, ImageDraw
 
-        if not image_explanation_text:
-            return temp_save_path_wsl
+    if not image_explanation_text or not image_explanation_text.strip():
+        if image_response is not None:
+            write_image_response(image_response, temp_save_path_wsl)
+        return temp_save_path_wsl
+
+    marker = text_marker(image_explanation_text)
+    try:
+        target_size = get_target_size()
+        if image_response is not None:
+            image_response.raw.decode_content = True
+            temp_save_path_wsl.parent.mkdir(parents=True, exist_ok=True)
+            with image_response:
+                image = Image.open(image_response.raw)
+                if target_size:
+                    image.thumbnail(target_size, Image.Resampling.LANCZOS)
+                image.load()
+        else:
+            image = Image.open(temp_save_path_wsl)
+            if read_text_marker(image) == marker:
+                logging.info(f"Explanation text already present in: {temp_save_path_wsl}")
+                return temp_save_path_wsl
+            if target_size:
+                image.thumbnail(target_size, Image.Resampling.LANCZOS)
 
-        draw = ImageDraw.Draw(image)
         img_width, img_height = image.size
-        text_color = (255, 255, 255)
-        font_size = int(img_height / 60)
-        font = ImageFont.truetype(FONT_PATH, font_size)
+        # White is no ink in CMYK, while Pillow would read (255, 255, 255) as black there
+        text_color = (0, 0, 0, 0) if image.mode == "CMYK" else (255, 255, 255)
+        # Round to an even size so similar image heights share a cached font
+        font_size = max(2, round(img_height / 120) * 2)
         max_text_width = int(img_width * 0.5)
-        chars_per_line = max_text_width // (font_size // 2) if font_size > 0 else 80
-        wrapped_text = textwrap.fill(image_explanation_text, width=chars_per_line)
         padding = 20
-        text_bbox = draw.textbbox((0,0), wrapped_text, font=font)
-        text_height = text_bbox[3] - text_bbox[1]
+        font, wrapped_text, text_height = fit_text(
+            image_explanation_text, max_text_width, img_height - 2 * padding, font_size
+        )
         x_position = padding
         y_position = max(0, img_height - text_height - padding)
-        draw.multiline_text((x_position, y_position), wrapped_text, fill=text_color, font=font)
-        image.save(temp_save_path_wsl)
+        # Glyphs such as "j" start left of the pen position, so the text region
+        # starts that much further left
+        left_margin = min(x_position, max(0, *(-font.getbbox(line[:1])[0] for line in wrapped_text.split("\n"))))
+        text_x = x_position - left_margin
+        text_width = min(img_width - x_position, text_block_width(wrapped_text, font)) + left_margin
+        if image.mode in ("RGB", "RGBA", "L", "LA"):
+            # Rasterize the text into a grayscale mask just large enough for it and
+            # paste white through it, instead of drawing on the full-resolution canvas
+            text_mask = render_text_mask(wrapped_text, font, (text_width, text_height), left_margin)
+            image.paste("white", (text_x, y_position), text_mask)
+        elif image.mode != "P":
+            # Draw on a crop of just the text region and paste it back. Palette images
+            # are drawn on directly, as a crop would allocate colors in its own palette.
+            box = (text_x, y_position, text_x + text_width, y_position + text_height)
+            text_region = image.crop(box)
+            ImageDraw.Draw(text_region).multiline_text(
+                (left_margin, 0), wrapped_text, fill=text_color, font=font, spacing=LINE_SPACING
+            )
+            image.paste(text_region, box[:2])
+        else:
+            draw = ImageDraw.Draw(image)
+            draw.multiline_text(
+                (x_position, y_position), wrapped_text, fill=text_color, font=font, spacing=LINE_SPACING
+            )
+        # Reuse the source encoding settings instead of re-encoding with defaults.
+        # Camera JPEGs with embedded previews are opened as MPO, which quality="keep"
+        # rejects, so the source quantization tables and subsampling are passed directly.
+        if image.format in ("JPEG", "MPO"):
+            from PIL import JpegImagePlugin
+
+            image.save(
+                temp_save_path_wsl,
+                "JPEG",
+                qtables=image.quantization,
+                subsampling=JpegImagePlugin.get_sampling(image),
+                optimize=False,
+                comment=marker,
+            )
+        elif image.format == "PNG":
+            from PIL import PngImagePlugin
+
+            pnginfo = PngImagePlugin.PngInfo()
+            pnginfo.add_text(TEXT_MARKER_KEY, marker)
+            image.save(temp_save_path_wsl, "PNG", optimize=False, compress_level=1, pnginfo=pnginfo)
+        else:
+            image.save(temp_save_path_wsl, image.format, optimize=False, compress_level=1)
         logging.info(f"Explanation text added and saved to: {temp_save_path_wsl}")
         return temp_save_path_wsl
     except FileNotFoundError:
@@ -185,7 +912,129 @@ def add_image_explanation_text(temp_save_path_wsl: Path, image_explanation_text:
         logging.error(f"Error adding text to image: {e}")
         raise
 
-def move_image_from_wsl_to_windows(filename: str, temp_save_path_wsl: Path, windows_save_dir: Path) -> None:
+def win_to_wsl(windows_path: str) -> str:
+    """
+    Translate a Windows drive path into its WSL mount path without spawning wslpath.
+
+    Example: C:\\Users\\AD\\Pictures -> /mnt/c/Users/AD/Pictures
+
+    Args:
+        windows_path (str): Windows path starting with a drive letter
+
+    Returns:
+        str: The path in WSL format
+
+    Raises:
+        ValueError: If the path does not start with a drive letter (e.g. UNC paths)
+    """
+    match = WINDOWS_DRIVE_PATH.match(windows_path)
+    if not match:
+        raise ValueError(f"Not a Windows drive path: {windows_path}")
+    return f"/mnt/{match[1].lower()}/" + match[2].replace("\\", "/")
+
+def wslpath(windows_path: str) -> str:
+    """
+    Translate a Windows path into WSL format using the wslpath tool.
+
+    Args:
+        windows_path (str): Windows path to translate
+
+    Returns:
+        str: The path in WSL format
+
+    Raises:
+        subprocess.CalledProcessError: If wslpath fails
+    """
+    return subprocess.run(
+        ["wslpath", "-u", windows_path],
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout.strip()
+
+def resolve_windows_paths(filename: str, windows_save_dir: Path) -> Tuple[str, str]:
+    """
+    Translate the Windows save directory and target file path into WSL format.
+
+    Drive paths are translated in Python. wslpath is only used for paths that
+    cannot be translated that way (e.g. UNC paths) or when USE_WSLPATH is set.
+
+    Args:
+        filename (str): Name of the file to move
+        windows_save_dir (Path): Windows directory path to save the file to
+
+    Returns:
+        Tuple[str, str]: The save directory and the target file path in WSL format
+
+    Raises:
+        subprocess.CalledProcessError: If wslpath fails
+    """
+    windows_save_path = windows_save_dir / filename
+    if not os.getenv("USE_WSLPATH"):
+        try:
+            return win_to_wsl(str(windows_save_dir)), win_to_wsl(str(windows_save_path))
+        except ValueError:
+            logging.info(f"Falling back to wslpath for {windows_save_dir}")
+    # The file lives directly in the save directory, so one wslpath call is enough
+    windows_save_dir_wsl_format = wslpath(str(windows_save_dir))
+    return windows_save_dir_wsl_format, str(Path(windows_save_dir_wsl_format) / filename)
+
+def copy_file(source: Path, destination: str) -> None:
+    """
+    Copy a file using as few syscalls as possible.
+
+    Tries a reflink clone first. Otherwise shutil.copyfile is used, which copies
+    with os.sendfile on Linux and falls back to a read/write loop where the target
+    filesystem (e.g. the /mnt/c bridge) does not support it.
+
+    Args:
+        source (Path): Path of the file to copy
+        destination (str): Path to copy the file to
+
+    Raises:
+        IOError: If there's an error copying the file
+    """
+    with open(source, "rb") as source_file, open(destination, "wb") as destination_file:
+        try:
+            fcntl.ioctl(destination_file.fileno(), fcntl.FICLONE, source_file.fileno())
+            return
+        except OSError:
+            pass
+    shutil.copyfile(source, destination)
+
+def prepare_windows_save_dir(filename: str, windows_save_dir: Path) -> Tuple[str, str]:
+    """
+    Resolve the WSL paths of the Windows save directory and target file, and create the directory.
+
+    Creating a directory on /mnt/c is slow, so main() runs this while the image is
+    still downloading.
+
+    Args:
+        filename (str): Name of the file to move
+        windows_save_dir (Path): Windows directory path to save the file to
+
+    Returns:
+        Tuple[str, str]: The save directory and the target file path in WSL format
+
+    Raises:
+        subprocess.CalledProcessError: If wslpath fails
+        IOError: If there's an error creating the directory
+    """
+    wsl_paths = resolve_windows_paths(filename, windows_save_dir)
+    try:
+        Path(wsl_paths[0]).mkdir(parents=True, exist_ok=True)
+        logging.info(f"Created Windows directory: {windows_save_dir}")
+    except OSError as e:
+        logging.error(f"Creating Windows directory failed: {e}")
+        raise
+    return wsl_paths
+
+def move_image_from_wsl_to_windows(
+    filename: str,
+    temp_save_path_wsl: Path,
+    windows_save_dir: Path,
+    wsl_paths: Optional[Tuple[str, str]] = None,
+) -> None:
     """
     Move the processed image from WSL to Windows filesystem.
     
@@ -193,37 +1042,50 @@ def move_image_from_wsl_to_windows(filename: str, temp_save_path_wsl: Path, wind
         filename (str): Name of the file to move
         temp_save_path_wsl (Path): Current path of the file in WSL
         windows_save_dir (Path): Windows directory path to save the file to
+        wsl_paths (Optional[Tuple[str, str]]): WSL paths from prepare_windows_save_dir,
+            whose directory already exists; prepared here if not given
         
     Raises:
-        subprocess.CalledProcessError: If a shell command fails
-        IOError: If there's an error copying the file
+        subprocess.CalledProcessError: If wslpath fails
+        IOError: If there's an error creating the directory or copying the file
     """
     windows_save_path = windows_save_dir / filename
-    windows_save_dir_wsl_format = subprocess.run(
-        ["wslpath", "-u", str(windows_save_dir)],
-        capture_output=True,
-        text=True,
-        check=True
-    ).stdout.strip()
-    windows_save_path_wsl_format = subprocess.run(
-        ["wslpath", "-u", str(windows_save_path)],
-        capture_output=True,
-        text=True,
-        check=True
-    ).stdout.strip()
-    create_dir_command = f"mkdir -p '{windows_save_dir_wsl_format}'"
-    copy_command = f"cp '{temp_save_path_wsl}' '{windows_save_path_wsl_format}'"
+    if wsl_paths is None:
+        wsl_paths = prepare_windows_save_dir(filename, windows_save_dir)
     try:
-        subprocess.run(create_dir_command, shell=True, check=True, capture_output=True)
-        logging.info(f"Created Windows directory: {windows_save_dir}")
-        subprocess.run(copy_command, shell=True, check=True, capture_output=True)
+        copy_file(temp_save_path_wsl, wsl_paths[1])
         logging.info(f"Copied image to Windows: {windows_save_path}")
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Shell command failed: {e}\nOutput: {e.stdout}\nError: {e.stderr}")
+    except OSError as e:
+        logging.error(f"Copying image to Windows failed: {e}")
         raise
-    except Exception as e:
-        logging.error(f"Unexpected error: {e}")
+
+def move_image_to_wsl_dir(filename: str, temp_save_path_wsl: Path, wsl_save_dir: Path) -> Path:
+    """
+    Move the processed image into a directory on the WSL filesystem.
+
+    This avoids writing the image across the slow /mnt/c bridge; Windows can read it
+    via \\\\wsl$\\<distro>\\<path>.
+
+    Args:
+        filename (str): Name of the file to move
+        temp_save_path_wsl (Path): Current path of the file in WSL
+        wsl_save_dir (Path): WSL directory path to save the file to
+
+    Returns:
+        Path: Path to the moved image
+
+    Raises:
+        IOError: If there's an error creating the directory or moving the file
+    """
+    wsl_save_path = wsl_save_dir / filename
+    try:
+        wsl_save_dir.mkdir(parents=True, exist_ok=True)
+        shutil.move(temp_save_path_wsl, wsl_save_path)
+        logging.info(f"Moved image to WSL directory: {wsl_save_path}")
+    except OSError as e:
+        logging.error(f"Moving image to WSL directory failed: {e}")
         raise
+    return wsl_save_path
 
 def main() -> None:
     """
@@ -234,24 +1096,79 @@ def main() -> None:
         requests.RequestException: If API requests fail
         IOError: If there are file operation errors
     """
+    # Load the .env file first so that LOG_FILE_PATH from it applies to the log
+    load_env_file()
+    listener = setup_logging()
     try:
-        api_key, windows_save_dir = load_config()
-        api_response = get_api_response(api_key)
-        if api_response.status_code != 200:
-            logging.error(f"NASA APOD API request failed with status code {api_response.status_code}: {api_response.text}")
-            return
-        filename, image_response, image_explanation_text, media_type = process_data(api_response)
-        if media_type != "image":
-            logging.info(f"Media type is '{media_type}'. No image to process. Exiting cleanly.")
-            return
-        if not filename or not image_response:
-            logging.warning("Failed to get required image data from NASA APOD API. Skipping image processing.")
-            return
-        temp_wsl_image_path = temp_save_to_wsl(filename, image_response)
-        processed_image_path = add_image_explanation_text(temp_wsl_image_path, image_explanation_text)
-        move_image_from_wsl_to_windows(filename, processed_image_path, windows_save_dir)
+        api_key, windows_save_dir = load_config(load_env=False)
+        state = load_state()
+        destination = get_save_destination(windows_save_dir)
+        cache_file = get_api_cache_file(get_apod_date())
+        cached_response = load_cached_api_response(cache_file)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            if cached_response is not None:
+                # Already fetched today, so the API is not contacted at all
+                logging.info(f"Using cached APOD response from {cache_file}")
+                api_response = cached_response
+            else:
+                api_response = get_api_response(api_key, conditional_headers(state, destination))
+            if api_response.status_code == 304:
+                logging.info(f"APOD unchanged since the last run. Keeping {state['output_path']}.")
+                return
+            if api_response.status_code != 200:
+                logging.error(f"NASA APOD API request failed with status code {api_response.status_code}: {api_response.text}")
+                return
+            saved_output = saved_output_path(state, destination)
+            filename, image_response, image_explanation_text, media_type = process_data(
+                api_response, executor, saved_output, cache_response=cached_response is None
+            )
+            if media_type != "image":
+                logging.info(f"Media type is '{media_type}'. No image to process. Exiting cleanly.")
+                return
+            wsl_native_save_dir = os.getenv("WSL_NATIVE_SAVE_DIR")
+            wsl_paths_future = None
+            downloading = image_response is not None
+            if downloading:
+                # Prepare the remaining steps while the image is still downloading. Only now
+                # is it known that text will be drawn, so 304s and video days never import Pillow.
+                if image_explanation_text:
+                    executor.submit(preload_font)
+                if not wsl_native_save_dir:
+                    wsl_paths_future = executor.submit(prepare_windows_save_dir, filename, windows_save_dir)
+                if isinstance(image_response, Future):
+                    image_response = image_response.result()
+            if filename and not downloading:
+                # process_data only skips the download when the saved image already
+                # shows this APOD and explanation
+                logging.info(f"APOD image unchanged since the last run. Keeping {saved_output}.")
+                output_path = saved_output
+            elif not filename or not image_response:
+                logging.warning("Failed to get required image data from NASA APOD API. Skipping image processing.")
+                return
+            else:
+                if image_explanation_text:
+                    # Decode straight from the download, so only the annotated image hits the disk
+                    processed_image_path = add_image_explanation_text(
+                        TEMP_SAVE_DIR_WSL / filename, image_explanation_text, image_response
+                    )
+                else:
+                    processed_image_path = temp_save_to_wsl(filename, image_response)
+                if wsl_native_save_dir:
+                    output_path = move_image_to_wsl_dir(filename, processed_image_path, Path(wsl_native_save_dir))
+                else:
+                    wsl_paths = wsl_paths_future.result()
+                    move_image_from_wsl_to_windows(filename, processed_image_path, windows_save_dir, wsl_paths)
+                    output_path = Path(wsl_paths[1])
+        save_state({
+            "etag": api_response.headers.get("ETag", ""),
+            "last_modified": api_response.headers.get("Last-Modified", ""),
+            "output_path": str(output_path),
+            "destination": destination,
+        })
     except Exception as e:
         logging.error(f"Error in main execution: {e}")
+    finally:
+        stop_logging(listener)
 
 if __name__ == "__main__":
     main()
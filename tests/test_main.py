@@ -1,8 +1,37 @@
+import logging
+import json
+import os
+import io
 import pytest
+import requests
 from unittest.mock import patch, MagicMock
 from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+from PIL import Image
 import main
 
+@pytest.fixture(autouse=True)
+def temp_save_dir(monkeypatch, tmp_path):
+    # Keep overlay masks and cached API responses out of the real /tmp/apod-nasa
+    monkeypatch.setattr(main, 'TEMP_SAVE_DIR_WSL', tmp_path / 'tmp')
+
+@pytest.fixture
+def main_env(monkeypatch, tmp_path):
+    # Configuration for running main() end to end, saving inside tmp_path
+    monkeypatch.setattr(main, 'setup_logging', MagicMock())
+    monkeypatch.setenv('LOG_FILE_PATH', str(tmp_path / 'logs.txt'))
+    monkeypatch.setenv('NASA_APOD_API_KEY', 'testkey')
+    monkeypatch.setenv('WINDOWS_SAVE_DIR', 'C:\\APOD')
+    monkeypatch.setenv('WSL_NATIVE_SAVE_DIR', str(tmp_path / 'apod'))
+
+# A real response, so process_data can parse .content whether orjson is installed or not
+def make_api_response(data, headers=None):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers.update(headers or {})
+    response._content = json.dumps(data).encode()
+    return response
+
 def test_load_config_env_vars(monkeypatch):
     monkeypatch.setenv('NASA_APOD_API_KEY', 'testkey')
     monkeypatch.setenv('WINDOWS_SAVE_DIR', '/tmp')
@@ -16,14 +45,30 @@ def test_load_config_missing(monkeypatch):
     with pytest.raises(ValueError):
         main.load_config()
 
+def test_load_config_windows_dir_optional_with_wsl_dir(monkeypatch):
+    monkeypatch.setattr(os, 'environ', os.environ.copy())
+    monkeypatch.setenv('NASA_APOD_API_KEY', 'testkey')
+    monkeypatch.delenv('WINDOWS_SAVE_DIR', raising=False)
+    monkeypatch.setenv('WSL_NATIVE_SAVE_DIR', '/tmp/apod')
+    assert main.load_config(load_env=False) == ('testkey', None)
+    monkeypatch.delenv('WSL_NATIVE_SAVE_DIR')
+    with pytest.raises(ValueError):
+        main.load_config(load_env=False)
+
+def test_load_config_can_skip_env_file(monkeypatch):
+    monkeypatch.setenv('NASA_APOD_API_KEY', 'testkey')
+    monkeypatch.setenv('WINDOWS_SAVE_DIR', '/tmp')
+    with patch('main.load_env_file') as mock_load_env_file:
+        main.load_config(load_env=False)
+    mock_load_env_file.assert_not_called()
+
 def test_process_data_image():
-    mock_response = MagicMock()
-    mock_response.json.return_value = {
+    mock_response = make_api_response({
         'media_type': 'image',
         'hdurl': 'https://example.com/image.jpg',
         'explanation': 'Test explanation'
-    }
-    with patch('main.requests.get') as mock_get:
+    })
+    with patch('main.SESSION.get') as mock_get:
         mock_img_resp = MagicMock()
         mock_img_resp.content = b'data'
         mock_img_resp.raise_for_status.return_value = None
@@ -34,14 +79,528 @@ def test_process_data_image():
         assert explanation == 'Test explanation'
         assert media_type == 'image'
 
+def test_process_data_skips_saved_image(tmp_path):
+    saved_image = tmp_path / 'image.jpg'
+    Image.new('RGB', (1200, 800), (0, 0, 0)).save(saved_image)
+    main.add_image_explanation_text(saved_image, 'Test explanation')
+    mock_response = make_api_response({
+        'media_type': 'image',
+        'hdurl': 'https://example.com/image.jpg',
+        'explanation': 'Test explanation'
+    })
+    with patch('main.SESSION.get') as mock_get:
+        filename, image_response, explanation, media_type = main.process_data(mock_response, saved_output=saved_image)
+    mock_get.assert_not_called()
+    assert filename == 'image.jpg'
+    assert image_response is None
+
+def test_process_data_downloads_saved_image_with_corrected_explanation(tmp_path):
+    saved_image = tmp_path / 'image.jpg'
+    Image.new('RGB', (1200, 800), (0, 0, 0)).save(saved_image)
+    main.add_image_explanation_text(saved_image, 'Test explanation')
+    mock_response = make_api_response({
+        'media_type': 'image',
+        'hdurl': 'https://example.com/image.jpg',
+        'explanation': 'Corrected explanation'
+    })
+    with patch('main.SESSION.get') as mock_get:
+        _, image_response, _, _ = main.process_data(mock_response, saved_output=saved_image)
+    mock_get.assert_called_once()
+    assert image_response is mock_get.return_value
+
 def test_process_data_non_image():
-    mock_response = MagicMock()
-    mock_response.json.return_value = {
+    mock_response = make_api_response({
         'media_type': 'video',
         'explanation': 'Test explanation'
-    }
+    })
     filename, image_response, explanation, media_type = main.process_data(mock_response)
     assert filename == ''
     assert image_response is None
     assert explanation == 'Test explanation'
     assert media_type == 'video'
+
+def test_process_data_image_with_executor():
+    mock_response = make_api_response({
+        'media_type': 'image',
+        'hdurl': 'https://example.com/image.jpg',
+        'explanation': 'Test explanation'
+    })
+    with patch('main.SESSION.get') as mock_get, ThreadPoolExecutor(max_workers=1) as executor:
+        mock_img_resp = MagicMock()
+        mock_img_resp.raise_for_status.return_value = None
+        mock_get.return_value = mock_img_resp
+        filename, image_future, explanation, media_type = main.process_data(mock_response, executor)
+        assert filename == 'image.jpg'
+        assert isinstance(image_future, Future)
+        assert image_future.result() == mock_img_resp
+
+def test_temp_save_to_wsl_streams_body(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'TEMP_SAVE_DIR_WSL', tmp_path)
+    mock_img_resp = MagicMock()
+    mock_img_resp.raw = io.BytesIO(b'image-bytes')
+    mock_img_resp.headers = {'Content-Length': '11'}
+    saved_path = main.temp_save_to_wsl('image.jpg', mock_img_resp)
+    assert saved_path == tmp_path / 'image.jpg'
+    assert saved_path.read_bytes() == b'image-bytes'
+
+def test_win_to_wsl():
+    assert main.win_to_wsl('C:\\Users\\AD\\Pictures') == '/mnt/c/Users/AD/Pictures'
+    assert main.win_to_wsl('D:/APOD/image.jpg') == '/mnt/d/APOD/image.jpg'
+
+def test_win_to_wsl_unc_path():
+    with pytest.raises(ValueError):
+        main.win_to_wsl('\\\\server\\share\\APOD')
+
+def test_move_image_from_wsl_to_windows(tmp_path):
+    source = tmp_path / 'image.jpg'
+    source.write_bytes(b'image-bytes')
+    target_dir = tmp_path / 'windows' / 'APOD'
+    target_dir.mkdir(parents=True)
+    wsl_paths = (str(target_dir), str(target_dir / 'image.jpg'))
+    main.move_image_from_wsl_to_windows('image.jpg', source, Path('C:\\APOD'), wsl_paths)
+    assert (target_dir / 'image.jpg').read_bytes() == b'image-bytes'
+
+def test_copy_file(tmp_path):
+    source = tmp_path / 'source.jpg'
+    source.write_bytes(b'x' * 100_000)
+    destination = tmp_path / 'destination.jpg'
+    main.copy_file(source, str(destination))
+    assert destination.read_bytes() == source.read_bytes()
+
+def test_move_image_to_wsl_dir(tmp_path):
+    source = tmp_path / 'image.jpg'
+    source.write_bytes(b'image-bytes')
+    saved_path = main.move_image_to_wsl_dir('image.jpg', source, tmp_path / 'apod')
+    assert saved_path == tmp_path / 'apod' / 'image.jpg'
+    assert saved_path.read_bytes() == b'image-bytes'
+    assert not source.exists()
+
+def test_get_font_is_cached():
+    assert main.get_font(main.FONT_PATH, 20) is main.get_font(main.FONT_PATH, 20)
+
+def test_add_image_explanation_text(tmp_path):
+    image_path = tmp_path / 'image.jpg'
+    Image.new('RGB', (1200, 800), (0, 0, 0)).save(image_path)
+    result = main.add_image_explanation_text(image_path, 'A test explanation ' * 20)
+    assert result == image_path
+    with Image.open(image_path) as image:
+        assert image.size == (1200, 800)
+        # Text is drawn in white in the bottom left corner only
+        assert image.crop((0, 600, 600, 800)).getextrema()[0][1] > 200
+        assert image.crop((700, 0, 1200, 400)).getextrema()[0][1] < 50
+
+def test_add_image_explanation_text_png(tmp_path):
+    image_path = tmp_path / 'image.png'
+    Image.new('RGB', (1200, 800), (0, 0, 0)).save(image_path)
+    main.add_image_explanation_text(image_path, 'A test explanation')
+    with Image.open(image_path) as image:
+        assert image.format == 'PNG'
+        assert image.crop((0, 600, 600, 800)).getextrema()[0][1] > 200
+
+@pytest.mark.parametrize('suffix', ['jpg', 'png'])
+def test_add_image_explanation_text_skips_marked_image(tmp_path, suffix):
+    image_path = tmp_path / f'image.{suffix}'
+    Image.new('RGB', (1200, 800), (0, 0, 0)).save(image_path)
+    main.add_image_explanation_text(image_path, 'A test explanation')
+    rendered = image_path.read_bytes()
+    with patch('main.fit_text') as mock_fit:
+        main.add_image_explanation_text(image_path, 'A test explanation')
+    mock_fit.assert_not_called()
+    assert image_path.read_bytes() == rendered
+    # A different explanation is drawn again
+    main.add_image_explanation_text(image_path, 'Another explanation')
+    assert image_path.read_bytes() != rendered
+
+def test_add_image_explanation_text_matches_direct_draw(tmp_path):
+    from PIL import ImageChops, ImageDraw
+    # Lines starting with "j" or "f" have glyphs reaching left of the text position
+    text = 'jolly fjords and jagged ferns ' * 30
+    image_path = tmp_path / 'image.png'
+    Image.new('RGB', (1200, 800), (0, 0, 0)).save(image_path)
+    main.add_image_explanation_text(image_path, text)
+    font, wrapped, height = main.fit_text(text, 600, 760, 14)
+    expected = Image.new('RGB', (1200, 800), (0, 0, 0))
+    ImageDraw.Draw(expected).multiline_text(
+        (20, 800 - height - 20), wrapped, fill=(255, 255, 255), font=font, spacing=main.LINE_SPACING
+    )
+    with Image.open(image_path) as image:
+        assert ImageChops.difference(image.convert('RGB'), expected).getbbox() is None
+
+def test_load_env_file(monkeypatch, tmp_path):
+    env_file = tmp_path / '.env'
+    env_file.write_text('# comment\nNASA_APOD_API_KEY=filekey\n\nWINDOWS_SAVE_DIR=C:\\Users\\AD\\APOD\n')
+    monkeypatch.setattr(os, 'environ', os.environ.copy())
+    monkeypatch.delenv('NASA_APOD_API_KEY', raising=False)
+    monkeypatch.setenv('WINDOWS_SAVE_DIR', '/tmp')
+    main.load_env_file(env_file)
+    assert os.environ['NASA_APOD_API_KEY'] == 'filekey'
+    assert os.environ['WINDOWS_SAVE_DIR'] == '/tmp'
+
+def test_load_env_file_falls_back_to_dotenv(monkeypatch, tmp_path):
+    env_file = tmp_path / '.env'
+    env_file.write_text('NASA_APOD_API_KEY="quoted key"\n')
+    monkeypatch.setattr(os, 'environ', os.environ.copy())
+    monkeypatch.delenv('NASA_APOD_API_KEY', raising=False)
+    main.load_env_file(env_file)
+    assert os.environ['NASA_APOD_API_KEY'] == 'quoted key'
+
+def test_wrap_to_pixels():
+    font = main.get_font(main.FONT_PATH, 20)
+    text = 'The quick brown fox jumps over the lazy dog. ' * 10
+    wrapped = main.wrap_to_pixels(text, font, 300)
+    lines = wrapped.split('\n')
+    assert len(lines) > 1
+    assert all(font.getlength(line) <= 300 for line in lines)
+    assert ' '.join(lines) == ' '.join(text.split())
+
+def test_add_image_explanation_text_from_response(tmp_path):
+    image_bytes = io.BytesIO()
+    Image.new('RGB', (1200, 800), (0, 0, 0)).save(image_bytes, 'JPEG')
+    mock_img_resp = MagicMock()
+    mock_img_resp.raw = io.BytesIO(image_bytes.getvalue())
+    image_path = tmp_path / 'apod' / 'image.jpg'
+    result = main.add_image_explanation_text(image_path, 'A test explanation', mock_img_resp)
+    assert result == image_path
+    with Image.open(image_path) as image:
+        assert image.format == 'JPEG'
+        assert image.crop((0, 600, 600, 800)).getextrema()[0][1] > 200
+
+def test_state_round_trip(monkeypatch, tmp_path):
+    monkeypatch.setenv('LOG_FILE_PATH', str(tmp_path / 'logs.txt'))
+    assert main.load_state() == {}
+    main.save_state({'etag': '"abc"', 'last_modified': '', 'output_path': '/tmp/x.jpg'})
+    assert main.load_state()['etag'] == '"abc"'
+
+def test_conditional_headers(tmp_path):
+    output_path = tmp_path / 'image.jpg'
+    state = {
+        'etag': '"abc"',
+        'last_modified': 'Tue, 14 Oct 2026 00:00:00 GMT',
+        'output_path': str(output_path),
+        'destination': str(tmp_path),
+    }
+    assert main.conditional_headers(state, str(tmp_path)) == {}
+    output_path.write_bytes(b'image-bytes')
+    assert main.conditional_headers(state, str(tmp_path)) == {
+        'If-None-Match': '"abc"',
+        'If-Modified-Since': 'Tue, 14 Oct 2026 00:00:00 GMT',
+    }
+    # Output saved to another directory than the one configured now is not kept
+    assert main.conditional_headers(state, str(tmp_path / 'other')) == {}
+
+def test_resolve_windows_paths_wslpath_fallback(monkeypatch):
+    monkeypatch.setenv('USE_WSLPATH', '1')
+    with patch('main.subprocess.run') as mock_run:
+        mock_run.return_value.stdout = '/mnt/c/APOD\n'
+        wsl_paths = main.resolve_windows_paths('image.jpg', Path('C:\\APOD'))
+    assert wsl_paths == ('/mnt/c/APOD', '/mnt/c/APOD/image.jpg')
+    assert mock_run.call_count == 1
+
+def test_main_saves_annotated_image(monkeypatch, tmp_path, main_env):
+    image_bytes = io.BytesIO()
+    Image.new('RGB', (1200, 800), (0, 0, 0)).save(image_bytes, 'JPEG')
+
+    def fake_get(url, **kwargs):
+        if url.startswith(main.BASE_URL):
+            return make_api_response({
+                'media_type': 'image',
+                'hdurl': 'https://example.com/image.jpg',
+                'explanation': 'Test explanation',
+            }, {'ETag': '"abc"'})
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {}
+        response.raw = io.BytesIO(image_bytes.getvalue())
+        return response
+
+    with patch('main.SESSION.get', side_effect=fake_get):
+        main.main()
+    assert (tmp_path / 'apod' / 'image.jpg').exists()
+    assert main.load_state()['output_path'] == str(tmp_path / 'apod' / 'image.jpg')
+
+def test_main_skips_download_of_saved_image(monkeypatch, tmp_path, main_env):
+    saved_image = tmp_path / 'apod' / 'image.jpg'
+    saved_image.parent.mkdir()
+    Image.new('RGB', (1200, 800), (0, 0, 0)).save(saved_image)
+    main.add_image_explanation_text(saved_image, 'Test explanation')
+    saved_bytes = saved_image.read_bytes()
+    api_response = make_api_response({
+        'media_type': 'image',
+        'hdurl': 'https://example.com/image.jpg',
+        'explanation': 'Test explanation',
+    }, {'ETag': '"new"'})
+    main.save_state({
+        'etag': '"old"',
+        'last_modified': '',
+        'output_path': str(saved_image),
+        'destination': str(tmp_path / 'apod'),
+    })
+    with patch('main.SESSION.get', return_value=api_response) as mock_get:
+        main.main()
+    # Only the API was requested, the saved image was left as is
+    assert mock_get.call_count == 1
+    assert saved_image.read_bytes() == saved_bytes
+    assert main.load_state()['etag'] == '"new"'
+
+def test_main_saves_again_after_destination_change(monkeypatch, tmp_path, main_env):
+    image_bytes = io.BytesIO()
+    Image.new('RGB', (1200, 800), (0, 0, 0)).save(image_bytes, 'JPEG')
+    saved_image = tmp_path / 'apod' / 'image.jpg'
+    saved_image.parent.mkdir()
+    Image.new('RGB', (1200, 800), (0, 0, 0)).save(saved_image)
+    main.add_image_explanation_text(saved_image, 'Test explanation')
+
+    def fake_get(url, **kwargs):
+        if url.startswith(main.BASE_URL):
+            return make_api_response({
+                'media_type': 'image',
+                'hdurl': 'https://example.com/image.jpg',
+                'explanation': 'Test explanation',
+            })
+        response = MagicMock()
+        response.headers = {}
+        response.raw = io.BytesIO(image_bytes.getvalue())
+        return response
+
+    monkeypatch.setenv('WSL_NATIVE_SAVE_DIR', str(tmp_path / 'moved'))
+    main.save_state({'etag': '', 'last_modified': '', 'output_path': str(saved_image), 'destination': str(tmp_path / 'apod')})
+    with patch('main.SESSION.get', side_effect=fake_get) as mock_get:
+        main.main()
+    assert mock_get.call_count == 2
+    assert (tmp_path / 'moved' / 'image.jpg').exists()
+    assert main.load_state()['destination'] == str(tmp_path / 'moved')
+
+def test_main_warns_when_image_download_fails(monkeypatch, tmp_path, caplog, main_env):
+    def fake_get(url, **kwargs):
+        if url.startswith(main.BASE_URL):
+            return make_api_response({
+                'media_type': 'image',
+                'hdurl': 'https://example.com/image.jpg',
+                'explanation': 'Test explanation',
+            })
+        raise requests.ConnectionError('connection refused')
+
+    with caplog.at_level(logging.INFO), patch('main.SESSION.get', side_effect=fake_get):
+        main.main()
+    assert 'Skipping image processing' in caplog.text
+    assert [record.message for record in caplog.records if record.levelno >= logging.ERROR] == [
+        'Image download failed: connection refused'
+    ]
+
+def test_main_does_not_load_font_without_image(monkeypatch, tmp_path, main_env):
+    monkeypatch.setattr(main, 'preload_font', MagicMock())
+    api_response = make_api_response({'media_type': 'video', 'explanation': 'Test explanation'})
+    with patch('main.SESSION.get', return_value=api_response), patch('main.load_env_file') as mock_load_env_file:
+        main.main()
+    main.preload_font.assert_not_called()
+    # The .env file is read once per run
+    mock_load_env_file.assert_called_once()
+
+def test_add_image_explanation_text_without_text_writes_response(tmp_path):
+    mock_img_resp = MagicMock()
+    mock_img_resp.raw = io.BytesIO(b'image-bytes')
+    mock_img_resp.headers = {}
+    image_path = tmp_path / 'apod' / 'image.jpg'
+    assert main.add_image_explanation_text(image_path, None, mock_img_resp) == image_path
+    assert image_path.read_bytes() == b'image-bytes'
+
+def test_add_image_explanation_text_downscales(monkeypatch, tmp_path):
+    monkeypatch.setenv('TARGET_WIDTH', '600')
+    monkeypatch.setenv('TARGET_HEIGHT', '600')
+    image_path = tmp_path / 'image.jpg'
+    Image.new('RGB', (1200, 800), (0, 0, 0)).save(image_path)
+    main.add_image_explanation_text(image_path, 'A test explanation')
+    with Image.open(image_path) as image:
+        assert image.size == (600, 400)
+
+def test_main_uses_cached_api_response_for_the_day(monkeypatch, tmp_path, main_env):
+    main.TEMP_SAVE_DIR_WSL.mkdir()
+    (main.TEMP_SAVE_DIR_WSL / 'apod-2000-01-01.json').write_text('{}')
+    data = {'date': main.get_apod_date(), 'media_type': 'video', 'explanation': 'Test explanation'}
+    with patch('main.SESSION.get', return_value=make_api_response(data, {'ETag': '"abc"'})) as mock_get:
+        main.main()
+        main.main()
+    mock_get.assert_called_once()
+    # The cache of an earlier day was replaced
+    assert [path.name for path in main.TEMP_SAVE_DIR_WSL.glob('apod-*.json')] == [f"apod-{data['date']}.json"]
+    cached_response = main.load_cached_api_response(main.get_api_cache_file(data['date']))
+    assert cached_response.json() == data
+    assert cached_response.headers['ETag'] == '"abc"'
+
+@pytest.mark.parametrize('cached', ['not json', '[]', '{"headers": "abc", "content": ""}', '{"headers": 5, "content": ""}', '{"headers": {}, "content": 5}'])
+def test_load_cached_api_response_ignores_foreign_files(tmp_path, cached):
+    cache_file = tmp_path / 'apod-2026-10-14.json'
+    cache_file.write_text(cached)
+    assert main.load_cached_api_response(cache_file) is None
+
+def test_process_data_does_not_cache_previous_apod(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'TEMP_SAVE_DIR_WSL', tmp_path)
+    api_response = make_api_response({'date': '2000-01-01', 'media_type': 'video'})
+    main.process_data(api_response, cache_response=True)
+    assert not list(tmp_path.iterdir())
+
+def test_get_apod_date_without_time_zone_database(monkeypatch):
+    monkeypatch.setattr(main, 'ZoneInfo', MagicMock(side_effect=main.ZoneInfoNotFoundError))
+    assert len(main.get_apod_date()) == 10
+
+@pytest.mark.parametrize('width, height', [('0', '600'), ('600', '-100'), ('wide', '600')])
+def test_get_target_size_ignores_invalid_values(monkeypatch, width, height):
+    monkeypatch.setenv('TARGET_WIDTH', width)
+    monkeypatch.setenv('TARGET_HEIGHT', height)
+    assert main.get_target_size() is None
+
+def test_session_retries_transient_errors():
+    retry = main.SESSION.get_adapter(main.BASE_URL).max_retries
+    assert retry.total == 3
+    assert retry.backoff_factor == 2
+    assert 503 in retry.status_forcelist
+
+def test_process_data_parses_content_with_orjson(monkeypatch):
+    # The stdlib json module shares orjson's loads(bytes) interface
+    monkeypatch.setattr(main, 'orjson', json)
+    mock_response = MagicMock()
+    mock_response.content = json.dumps({'media_type': 'video', 'explanation': 'Test explanation'}).encode()
+    filename, image_response, explanation, media_type = main.process_data(mock_response)
+    assert explanation == 'Test explanation'
+    assert media_type == 'video'
+    mock_response.json.assert_not_called()
+
+def test_setup_logging_writes_through_queue(monkeypatch, tmp_path):
+    log_file = tmp_path / 'logs.txt'
+    monkeypatch.setenv('LOG_FILE_PATH', str(log_file))
+    root_logger = logging.getLogger()
+    monkeypatch.setattr(root_logger, 'handlers', [])
+    monkeypatch.setattr(root_logger, 'level', root_logger.level)
+    listener = main.setup_logging()
+    listener.stop()
+    assert 'Script started.' in log_file.read_text()
+
+def test_stop_logging_detaches_handlers(monkeypatch, tmp_path):
+    monkeypatch.setenv('LOG_FILE_PATH', str(tmp_path / 'logs.txt'))
+    root_logger = logging.getLogger()
+    monkeypatch.setattr(root_logger, 'handlers', [])
+    monkeypatch.setattr(root_logger, 'level', root_logger.level)
+    for _ in range(2):
+        listener = main.setup_logging()
+        main.stop_logging(listener)
+        assert root_logger.handlers == []
+    assert (tmp_path / 'logs.txt').read_text().count('Script started.') == 2
+
+def test_add_image_explanation_text_grayscale(tmp_path):
+    image_path = tmp_path / 'image.png'
+    Image.new('L', (1200, 800), 0).save(image_path)
+    main.add_image_explanation_text(image_path, 'A test explanation')
+    with Image.open(image_path) as image:
+        assert image.mode == 'L'
+        assert image.crop((0, 600, 600, 800)).getextrema()[1] > 200
+
+def test_prepare_windows_save_dir(monkeypatch, tmp_path):
+    target_dir = tmp_path / 'windows' / 'APOD'
+    monkeypatch.setenv('USE_WSLPATH', '1')
+    with patch('main.subprocess.run') as mock_run:
+        mock_run.return_value.stdout = f'{target_dir}\n'
+        wsl_paths = main.prepare_windows_save_dir('image.jpg', Path('C:\\APOD'))
+    assert wsl_paths == (str(target_dir), str(target_dir / 'image.jpg'))
+    assert target_dir.is_dir()
+
+def test_fit_text_keeps_preferred_size_when_it_fits():
+    font, wrapped, height = main.fit_text('A short explanation', 600, 400, 20)
+    assert font.size == 20
+    assert height <= 400
+
+def test_fit_text_shrinks_long_text():
+    text = 'A much longer explanation that will not fit at the preferred size. ' * 30
+    font, wrapped, height = main.fit_text(text, 600, 300, 40)
+    assert main.MIN_FONT_SIZE <= font.size < 40
+    assert height <= 300
+    # The next even size up would no longer fit
+    larger_font = main.get_font(main.FONT_PATH, font.size + 2)
+    larger_wrapped = main.wrap_to_pixels(text, larger_font, 600)
+    assert main.text_block_height(larger_wrapped, larger_font) > 300
+
+def test_text_block_height_fits_last_line():
+    from PIL import ImageDraw
+    font = main.get_font(main.FONT_PATH, main.MIN_FONT_SIZE)
+    wrapped = '\n'.join(['Jagged typography quip'] * 8)
+    height = main.text_block_height(wrapped, font)
+    bbox = ImageDraw.Draw(Image.new('L', (1, 1))).multiline_textbbox(
+        (0, 0), wrapped, font=font, spacing=main.LINE_SPACING
+    )
+    assert bbox[3] <= height <= bbox[3] + 2
+
+def test_wrap_to_pixels_long_word():
+    font = main.get_font(main.FONT_PATH, 20)
+    wrapped = main.wrap_to_pixels('short ' + 'x' * 100 + ' words', font, 300)
+    assert wrapped.split('\n') == ['short', 'x' * 100, 'words']
+
+def test_char_width_matches_font():
+    font = main.get_font(main.FONT_PATH, 20)
+    assert main.char_width(font, 'a') == font.getlength('a')
+
+def test_render_text_mask_is_cached(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'TEMP_SAVE_DIR_WSL', tmp_path)
+    font = main.get_font(main.FONT_PATH, 20)
+    text_mask = main.render_text_mask('A test\nexplanation', font, (300, 60))
+    assert len(list((tmp_path / 'overlays').iterdir())) == 1
+    with patch('PIL.ImageDraw.Draw') as mock_draw:
+        cached_mask = main.render_text_mask('A test\nexplanation', font, (300, 60))
+    mock_draw.assert_not_called()
+    assert cached_mask.tobytes() == text_mask.tobytes()
+    # A new mask replaces the old one
+    main.render_text_mask('Another explanation', font, (300, 60))
+    assert len(list((tmp_path / 'overlays').iterdir())) == 1
+
+def test_add_image_explanation_text_keeps_jpeg_quantization(tmp_path):
+    image_path = tmp_path / 'image.jpg'
+    Image.new('RGB', (1200, 800), (0, 0, 0)).save(image_path, quality=95)
+    with Image.open(image_path) as image:
+        source_quantization = image.quantization
+    main.add_image_explanation_text(image_path, 'A test explanation')
+    with Image.open(image_path) as image:
+        assert image.quantization == source_quantization
+
+def test_add_image_explanation_text_mpo(tmp_path):
+    image_path = tmp_path / 'image.jpg'
+    frames = [Image.new('RGB', (1200, 800), (0, 0, 0)), Image.new('RGB', (1200, 800))]
+    frames[0].save(image_path, 'MPO', save_all=True, append_images=frames[1:])
+    main.add_image_explanation_text(image_path, 'A test explanation')
+    with Image.open(image_path) as image:
+        assert image.format == 'JPEG'
+        assert image.crop((0, 600, 600, 800)).getextrema()[0][1] > 200
+
+def test_text_block_width_covers_widest_line():
+    font = main.get_font(main.FONT_PATH, 20)
+    wrapped = 'A short line\nA somewhat longer line of text'
+    assert main.text_block_width(wrapped, font) >= font.getlength('A somewhat longer line of text')
+
+def test_add_image_explanation_text_cmyk(tmp_path):
+    image_path = tmp_path / 'image.jpg'
+    Image.new('CMYK', (1200, 800), (0, 0, 0, 255)).save(image_path)
+    main.add_image_explanation_text(image_path, 'A test explanation')
+    with Image.open(image_path) as image:
+        assert image.mode == 'CMYK'
+        assert image.size == (1200, 800)
+        # The text is drawn in white, not in black on black
+        assert image.convert('RGB').crop((0, 600, 600, 800)).getextrema()[0][1] > 200
+
+def test_add_image_explanation_text_whitespace_only(tmp_path):
+    image_path = tmp_path / 'image.jpg'
+    Image.new('RGB', (1200, 800), (0, 0, 0)).save(image_path)
+    source = image_path.read_bytes()
+    assert main.add_image_explanation_text(image_path, '   \n ') == image_path
+    assert image_path.read_bytes() == source
+
+def test_state_file_is_next_to_log_file(monkeypatch, tmp_path):
+    monkeypatch.setenv('LOG_FILE_PATH', str(tmp_path / 'logs' / 'apod.log'))
+    assert main.get_state_file() == tmp_path / 'logs' / 'apod-state.json'
+    monkeypatch.delenv('LOG_FILE_PATH')
+    assert main.get_log_file() == main.DEFAULT_LOG_FILE
+
+def test_process_data_filename_strips_query():
+    mock_response = make_api_response({
+        'media_type': 'image',
+        'hdurl': 'https://apod.nasa.gov/apod/image/2506/image.jpg?size=hd#top',
+    })
+    with patch('main.SESSION.get'):
+        filename, _, _, _ = main.process_data(mock_response)
+    assert filename == 'image.jpg'